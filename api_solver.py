@@ -1,14 +1,19 @@
 import os
 import sys
 import time
-import uuid
 import json
+import secrets
 import random
 import logging
 import asyncio
 import argparse
-from functools import wraps
-from quart import Quart, request, jsonify
+from functools import wraps, partial, lru_cache
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json
+    orjson = None
+from cachetools import TTLCache
+from quart import Quart, Response, request, jsonify
 # from camoufox.async_api import AsyncCamoufox
 from patchright.async_api import async_playwright
 from urllib.parse import urlparse
@@ -23,35 +28,65 @@ COLORS = {
 }
 
 
-class CustomLogger(logging.Logger):
-    @staticmethod
-    def format_message(level, color, message):
-        timestamp = time.strftime('%H:%M:%S')
-        return f"[{timestamp}] [{COLORS.get(color)}{level}{COLORS.get('RESET')}] -> {message}"
+# Dedicated level so logger.success goes through the normal filtering
+# machinery instead of piggybacking on INFO.
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
 
-    def debug(self, message, *args, **kwargs):
-        super().debug(self.format_message('DEBUG', 'MAGENTA', message), *args, **kwargs)
+# Fully colorized level names precomputed once, so emitting a record is a
+# single dict lookup instead of color lookups and concatenation per call.
+LEVEL_PREFIX = {
+    'DEBUG': f"{COLORS['MAGENTA']}DEBUG{COLORS['RESET']}",
+    'INFO': f"{COLORS['BLUE']}INFO{COLORS['RESET']}",
+    'SUCCESS': f"{COLORS['GREEN']}SUCCESS{COLORS['RESET']}",
+    'WARNING': f"{COLORS['YELLOW']}WARNING{COLORS['RESET']}",
+    'ERROR': f"{COLORS['RED']}ERROR{COLORS['RESET']}",
+}
 
-    def info(self, message, *args, **kwargs):
-        super().info(self.format_message('INFO', 'BLUE', message), *args, **kwargs)
 
-    def success(self, message, *args, **kwargs):
-        super().info(self.format_message('SUCCESS', 'GREEN', message), *args, **kwargs)
+class ColorLevelFilter(logging.Filter):
+    """Attach the precomputed colorized level name for the Formatter."""
 
-    def warning(self, message, *args, **kwargs):
-        super().warning(self.format_message('WARNING', 'YELLOW', message), *args, **kwargs)
+    def filter(self, record):
+        record.levelprefix = LEVEL_PREFIX.get(
+            record.levelname, record.levelname)
+        return True
 
-    def error(self, message, *args, **kwargs):
-        super().error(self.format_message('ERROR', 'RED', message), *args, **kwargs)
+
+class CustomLogger(logging.Logger):
+    def success(self, message, *args, **kwargs):
+        if self.isEnabledFor(SUCCESS):
+            self._log(SUCCESS, message, args, **kwargs)
 
 
 logging.setLoggerClass(CustomLogger)
 logger = logging.getLogger("TurnstileAPIServer")
 logger.setLevel(logging.DEBUG)
 handler = logging.StreamHandler(sys.stdout)
+# Timestamp and colors are rendered at emit time, after level filtering,
+# so suppressed records cost nothing.
+handler.setFormatter(logging.Formatter(
+    "[%(asctime)s] [%(levelprefix)s] -> %(message)s",
+    datefmt='%H:%M:%S'))
+handler.addFilter(ColorLevelFilter())
 logger.addHandler(handler)
 
 
+# Fixed error payloads pre-serialized once; handlers wrap them in a fresh
+# Response instead of running jsonify per request.
+ERR_MISSING_KEY = b'{"status": "error", "error": "Missing x-api-key header"}'
+ERR_INVALID_KEY = b'{"status": "error", "error": "Invalid API key"}'
+ERR_MISSING_PARAMS = b'{"status": "error", "error": "Both \'url\' and \'sitekey\' are required"}'
+ERR_SERVER_BUSY = b'{"status": "error", "error": "Server busy, try again later"}'
+ERR_MISSING_ID = b'{"status": "error", "error": "Missing \'id\' request parameter"}'
+ERR_UNKNOWN_ID = b'{"status": "error", "error": "Invalid or expired task ID"}'
+
+
+def json_error(body: bytes, status: int) -> Response:
+    """Wrap a pre-serialized error payload in a JSON response."""
+    return Response(body, status=status, mimetype='application/json')
+
+
 class TurnstileAPIServer:
     HTML_TEMPLATE = """
     <!DOCTYPE html>
@@ -83,10 +118,41 @@ class TurnstileAPIServer:
     </html>
     """
 
+    # Template halves pre-encoded once so building a page body is a single
+    # bytes concatenation instead of a full template scan per request.
+    # Background browser work the widget never needs; images are disabled
+    # too since the Turnstile iframe renders its own content.
+    CHROMIUM_ARGS = (
+        '--disable-dev-shm-usage',
+        '--disable-gpu',
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-sync',
+        '--disable-translate',
+        '--no-first-run',
+        '--no-default-browser-check',
+        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+        '--blink-settings=imagesEnabled=false',
+    )
+
+    HTML_HEAD, HTML_TAIL = HTML_TEMPLATE.split("<!-- cf turnstile -->")
+    HTML_HEAD = HTML_HEAD.encode("utf-8")
+    HTML_TAIL = HTML_TAIL.encode("utf-8")
+
     def __init__(self, headless: bool, useragent: str, debug: bool, browser_type: str, thread: int, proxy_support: bool, api_key: str = None):
         self.app = Quart(__name__)
         self.debug = debug
-        self.results = self._load_results()
+        # Wire the logger level to the debug flag so lazy %s-style debug
+        # calls short-circuit at the level check instead of formatting and
+        # emitting on every production request. SUCCESS (25) stays visible.
+        logger.setLevel(logging.DEBUG if debug else logging.INFO)
+        # Bounded store: entries expire after an hour so long runs cannot
+        # grow memory (or the on-disk snapshot) without limit. The snapshot
+        # path is overridable so multi-worker deployments can give each
+        # worker its own file instead of clobbering a shared one.
+        self.results = TTLCache(maxsize=10_000, ttl=3600)
+        self.results_file = os.getenv("RESULTS_FILE", "results.json")
+        self.results.update(self._load_results())
         self.browser_type = browser_type
         self.headless = headless
         self.useragent = useragent
@@ -94,7 +160,23 @@ class TurnstileAPIServer:
         self.proxy_support = proxy_support
         self.api_key = api_key
         self.browser_pool = asyncio.Queue()
-        self.browser_args = []
+        self.save_queue = asyncio.Queue()
+        # Back-pressure: allow some queueing beyond the browser pool, but
+        # reject outright once the backlog passes max_pending_solves instead
+        # of piling up coroutines on browser_pool.get().
+        self.solve_semaphore = asyncio.Semaphore(thread * 2)
+        self.max_pending_solves = thread * 4
+        self.pending_solves = 0
+        # Per-solve wall-clock budget in seconds (was 40 x 2s attempts).
+        self.solve_timeout = 20.0
+        self._proxy_cache = {}
+        # One (url, body) slot per pool entry, served by that entry's
+        # context route. Each solve owns its pooled context exclusively, so
+        # keying by pool index means concurrent solves for the same URL with
+        # different widget configs cannot clobber each other, and the dict
+        # stays bounded at thread_count entries.
+        self._bodies = {}
+        self.browser_args = list(self.CHROMIUM_ARGS)
         if useragent:
             self.browser_args.append(f"--user-agent={useragent}")
 
@@ -112,42 +194,69 @@ class TurnstileAPIServer:
 
             if not api_key:
                 logger.warning("Request blocked: Missing x-api-key header")
-                return jsonify({
-                    "status": "error",
-                    "error": "Missing x-api-key header"
-                }), 401
+                return json_error(ERR_MISSING_KEY, 401)
 
             if api_key != self.api_key:
                 logger.warning(
                     f"Request blocked: Invalid API key provided: {api_key[:10]}...")
-                return jsonify({
-                    "status": "error",
-                    "error": "Invalid API key"
-                }), 401
+                return json_error(ERR_INVALID_KEY, 401)
 
             logger.debug("API key validation successful")
             return await f(*args, **kwargs)
         return decorated_function
 
     @staticmethod
-    def _load_results():
-        """Load previous results from results.json."""
+    @lru_cache(maxsize=1024)
+    def _build_page(sitekey: str, action: str = None, cdata: str = None) -> bytes:
+        """Build (and cache) the page body for a sitekey/action/cdata combo."""
+        turnstile_div = f'<div class="cf-turnstile" style="background: white; width: 70px;" data-sitekey="{sitekey}"' + (
+            f' data-action="{action}"' if action else '') + (f' data-cdata="{cdata}"' if cdata else '') + '></div>'
+        return TurnstileAPIServer.HTML_HEAD + turnstile_div.encode("utf-8") + TurnstileAPIServer.HTML_TAIL
+
+    def _load_results(self):
+        """Load previous results from the snapshot file."""
         try:
-            if os.path.exists("results.json"):
-                with open("results.json", "r") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            if os.path.exists(self.results_file):
+                with open(self.results_file, "rb") as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
+        except (ValueError, IOError) as e:
             logger.warning(
                 f"Error loading results: {str(e)}. Starting with an empty results dictionary.")
         return {}
 
-    def _save_results(self):
-        """Save results to results.json."""
-        try:
-            with open("results.json", "w") as result_file:
-                json.dump(self.results, result_file, indent=4)
-        except IOError as e:
-            logger.error(f"Error saving results to file: {str(e)}")
+    @staticmethod
+    def _write_results(path, snapshot):
+        """Write a results snapshot to the given path (blocking)."""
+        if orjson:
+            with open(path, "wb") as result_file:
+                result_file.write(orjson.dumps(snapshot))
+        else:
+            with open(path, "w") as result_file:
+                json.dump(snapshot, result_file)
+
+    async def _results_writer(self) -> None:
+        """Persist results in the background, coalescing bursts of solves
+        into a single snapshot write off the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.save_queue.get()
+            # Drain whatever else completed in the meantime so a burst of
+            # solves costs one write, not one write each.
+            while not self.save_queue.empty():
+                self.save_queue.get_nowait()
+            try:
+                # Snapshot on the event-loop thread: TTLCache is not
+                # thread-safe, so the executor thread must never touch the
+                # live cache while solves keep mutating it.
+                snapshot = dict(self.results)
+                await loop.run_in_executor(
+                    None, self._write_results, self.results_file, snapshot)
+            except Exception as e:
+                # One bad write must not kill the writer task and silently
+                # disable persistence for the rest of the process.
+                logger.error(f"Error saving results to file: {str(e)}")
+            await asyncio.sleep(0.5)
 
     def _setup_routes(self) -> None:
         """Set up the application routes."""
@@ -162,6 +271,7 @@ class TurnstileAPIServer:
         """Initialize the browser and page pool on startup."""
         logger.info("Starting browser initialization")
         try:
+            asyncio.create_task(self._results_writer())
             await self._initialize_browser()
         except Exception as e:
             logger.error(f"Failed to initialize browser: {str(e)}")
@@ -175,128 +285,201 @@ class TurnstileAPIServer:
         # elif self.browser_type == "camoufox":
         #     camoufox = AsyncCamoufox(headless=self.headless)
 
-        for _ in range(self.thread_count):
-            if self.browser_type in ['chromium', 'chrome', 'msedge']:
-                browser = await playwright.chromium.launch(
-                    channel=self.browser_type,
-                    headless=self.headless,
-                    args=self.browser_args,
-                )
+        async def launch_and_warm(index: int) -> None:
+            browser = await playwright.chromium.launch(
+                channel=self.browser_type,
+                headless=self.headless,
+                args=self.browser_args,
+            )
 
             # elif self.browser_type == "camoufox":
             #     browser = await camoufox.start()
 
-            await self.browser_pool.put((_+1, browser))
+            # Warm context/page pair reused across solves; recreated only when
+            # a request needs a different proxy.
+            context = await browser.new_context()
+            await context.route("**/*", partial(self._fulfill_page, index))
+            page = await context.new_page()
+
+            await self.browser_pool.put((index, browser, context, page, None, None))
 
             if self.debug:
-                logger.success(f"Browser {_ + 1} initialized successfully")
+                logger.success(f"Browser {index} initialized successfully")
+
+        # Launch and warm every browser concurrently so startup costs one
+        # launch rather than thread_count sequential ones.
+        await asyncio.gather(*(launch_and_warm(i + 1)
+                               for i in range(self.thread_count)))
 
         logger.success(
             f"Browser pool initialized with {self.browser_pool.qsize()} browsers")
 
-    async def _solve_turnstile(self, task_id: str, url: str, sitekey: str, action: str = None, cdata: str = None, proxy: str = None):
-        """Solve the Turnstile challenge."""
+    async def _fulfill_page(self, index, route, request):
+        """Persistent context route: serve this pool entry's page body for
+        its current URL, let everything else (the Turnstile script) through."""
+        entry = self._bodies.get(index)
+        if entry is not None and request.url == entry[0]:
+            await route.fulfill(body=entry[1], status=200, content_type="text/html")
+        else:
+            await route.continue_()
 
-        index, browser = await self.browser_pool.get()
+    def _parse_proxy(self, proxy: str):
+        """Parse a proxy URL into Playwright's proxy dict, caching the result
+        so repeated proxy strings skip urlparse entirely."""
+        if not proxy:
+            return None
 
-        parsed = urlparse(proxy)
+        parsed_proxy = self._proxy_cache.get(proxy)
+        if parsed_proxy is None:
+            parsed = urlparse(proxy)
 
-        logger.debug(f"Proxy: {proxy}")
-        logger.debug(f"Parsed: {parsed}")
-        logger.debug(f"url: {url}")
-        logger.debug(f"sitekey: {sitekey}")
+            logger.debug("Parsed: %s", parsed)
 
-        username = parsed.username
-        password = parsed.password
-        ip = parsed.hostname
-        port = parsed.port
+            parsed_proxy = {
+                "server": f"{parsed.hostname}:{parsed.port}",
+                "username": parsed.username,
+                "password": parsed.password
+            }
+            self._proxy_cache[proxy] = parsed_proxy
 
-        parsed_proxy = {
-            "server": f"{ip}:{port}",
-            "username": username,
-            "password": password
-        }
+        return parsed_proxy
 
-        context = await browser.new_context(proxy=parsed_proxy)
+    async def _solve_turnstile_bounded(self, **kwargs):
+        """Run a solve under the concurrency semaphore.
 
-        page = await context.new_page()
+        pending_solves is incremented by process_turnstile before the task
+        is created; this finally is the matching decrement.
+        """
+        try:
+            async with self.solve_semaphore:
+                await self._solve_turnstile(**kwargs)
+        finally:
+            self.pending_solves -= 1
+
+    async def _solve_turnstile(self, task_id: str, url: str, sitekey: str, action: str = None, cdata: str = None, proxy: str = None):
+        """Solve the Turnstile challenge."""
+
+        index, browser, context, page, pooled_proxy, pooled_user_agent = await self.browser_pool.get()
+
+        logger.debug("Proxy: %s", proxy)
+        logger.debug("url: %s", url)
+        logger.debug("sitekey: %s", sitekey)
+
+        url_with_slash = url + "/" if not url.endswith("/") else url
 
         start_time = time.time()
+        solved = False
 
         try:
-            if self.debug:
-                logger.debug(
-                    f"Browser {index}: Starting Turnstile solve for URL: {url} with Sitekey: {sitekey} | Proxy: {proxy}")
-                logger.debug(
-                    f"Browser {index}: Setting up page data and route")
+            # Context setup runs inside the try: if a dead browser, crashed
+            # page or bad proxy makes any of these calls raise, the finally
+            # below still records CAPTCHA_FAIL and re-puts the pool slot
+            # instead of leaking capacity and leaving the task pending.
+            if proxy != pooled_proxy:
+                parsed_proxy = self._parse_proxy(proxy)
 
-            url_with_slash = url + "/" if not url.endswith("/") else url
-            turnstile_div = f'<div class="cf-turnstile" style="background: white;" data-sitekey="{sitekey}"' + (
-                f' data-action="{action}"' if action else '') + (f' data-cdata="{cdata}"' if cdata else '') + '></div>'
-            page_data = self.HTML_TEMPLATE.replace(
-                "<!-- cf turnstile -->", turnstile_div)
+                try:
+                    await context.close()
+                except Exception:
+                    pass  # the old context may already be dead
 
-            await page.route(url_with_slash, lambda route: route.fulfill(body=page_data, status=200))
-            await page.goto(url_with_slash)
+                context = await browser.new_context(proxy=parsed_proxy)
+                await context.route("**/*", partial(self._fulfill_page, index))
+                page = await context.new_page()
+            else:
+                await context.clear_cookies()
 
             if self.debug:
                 logger.debug(
-                    f"Browser {index}: Setting up Turnstile widget dimensions")
+                    f"Browser {index}: Starting Turnstile solve for URL: {url} with Sitekey: {sitekey} | Proxy: {proxy}")
+                logger.debug(
+                    f"Browser {index}: Setting up page data and route")
 
-            await page.eval_on_selector("//div[@class='cf-turnstile']", "el => el.style.width = '70px'")
+            # The persistent context route picks the body up from this pool
+            # entry's slot - no per-solve route registration round-trip.
+            self._bodies[index] = (
+                url_with_slash, self._build_page(sitekey, action, cdata))
+            # The fulfilled body is tiny and the Turnstile script loads
+            # asynchronously anyway, so there is no point waiting for "load".
+            await page.goto(url_with_slash, wait_until="domcontentloaded")
 
             if self.debug:
                 logger.debug(
-                    f"Browser {index}: Starting Turnstile response retrieval loop")
-
-            for _ in range(40):
-                try:
-                    turnstile_check = await page.input_value("[name=cf-turnstile-response]", timeout=2000)
-                    # Get cookies from the page context
-                    cookies = await page.context.cookies()
-
-                    if turnstile_check == "":
-                        if self.debug:
-                            logger.debug(
-                                f"Browser {index}: Attempt {_} - No Turnstile response yet")
-
-                        await page.locator("//div[@class='cf-turnstile']").click(timeout=1000)
-                        await asyncio.sleep(0.5)
-                    else:
-                        elapsed_time = round(time.time() - start_time, 3)
+                    f"Browser {index}: Waiting for Turnstile response")
+
+            # Turnstile only needs one interaction: click the widget once,
+            # then wait for the response value in-page. If the first half
+            # of the budget passes without a token, re-click once and wait
+            # out the remainder.
+            try:
+                await page.locator(".cf-turnstile").click(timeout=2000)
+            except Exception:
+                pass  # widget not clickable yet; the wait below still runs
+
+            token_wait = """() => {
+                const input = document.querySelector('[name=cf-turnstile-response]');
+                return input && input.value ? input.value : null;
+            }"""
+            half_budget = self.solve_timeout * 500
+            try:
+                token_handle = await page.wait_for_function(
+                    token_wait, timeout=half_budget, polling=500)
+            except Exception:
+                await page.locator(".cf-turnstile").click(timeout=2000)
+                token_handle = await page.wait_for_function(
+                    token_wait, timeout=half_budget, polling=500)
+            turnstile_check = await token_handle.json_value()
 
-                        logger.success(
-                            f"Browser {index}: Successfully solved captcha - {COLORS.get('MAGENTA')}{turnstile_check[:10]}{COLORS.get('RESET')} in {COLORS.get('GREEN')}{elapsed_time}{COLORS.get('RESET')} Seconds")
+            elapsed_time = round(time.time() - start_time, 3)
 
-                        user_agent = await page.evaluate("navigator.userAgent")
+            logger.success(
+                f"Browser {index}: Successfully solved captcha - {COLORS.get('MAGENTA')}{turnstile_check[:10]}{COLORS.get('RESET')} in {COLORS.get('GREEN')}{elapsed_time}{COLORS.get('RESET')} Seconds")
 
-                        self.results[task_id] = {
-                            "value": turnstile_check, "elapsed_time": elapsed_time, "cookies": cookies, "user_agent": user_agent}
-                        self._save_results()
-                        break
-                except:
-                    pass
+            # Fetch cookies and (on first use of this pool entry) the user
+            # agent concurrently - one round-trip instead of two. The user
+            # agent never changes for a pooled browser, so it is cached on
+            # the pool entry and the evaluate is skipped on later solves.
+            if pooled_user_agent is None:
+                cookies, pooled_user_agent = await asyncio.gather(
+                    page.context.cookies(), page.evaluate("navigator.userAgent"))
+            else:
+                cookies = await page.context.cookies()
+            user_agent = pooled_user_agent
 
-            if self.results.get(task_id) == "CAPTCHA_NOT_READY":
+            self.results[task_id] = {
+                "value": turnstile_check, "elapsed_time": elapsed_time, "cookies": cookies, "user_agent": user_agent}
+            self.save_queue.put_nowait(task_id)
+            # Only flip the flag once the result is recorded: if the
+            # cookies/user-agent fetch above raises after the token came
+            # back, the finally must still write CAPTCHA_FAIL so the task
+            # does not sit at CAPTCHA_NOT_READY until TTL eviction.
+            solved = True
+        except Exception as e:
+            if self.debug:
+                logger.error(
+                    f"Browser {index}: Error solving Turnstile: {str(e)}")
+        finally:
+            if not solved:
+                # Timeout or error: record the failure explicitly so the
+                # budget (solve_timeout) bounds worst-case latency and the
+                # browser goes back to the pool right away.
                 elapsed_time = round(time.time() - start_time, 3)
                 self.results[task_id] = {
                     "value": "CAPTCHA_FAIL", "elapsed_time": elapsed_time}
                 if self.debug:
                     logger.error(
                         f"Browser {index}: Error solving Turnstile in {COLORS.get('RED')}{elapsed_time}{COLORS.get('RESET')} Seconds")
-        except Exception as e:
-            elapsed_time = round(time.time() - start_time, 3)
-            self.results[task_id] = {
-                "value": "CAPTCHA_FAIL", "elapsed_time": elapsed_time}
-            if self.debug:
-                logger.error(
-                    f"Browser {index}: Error solving Turnstile: {str(e)}")
-        finally:
+
             if self.debug:
                 logger.debug(f"Browser {index}: Clearing page state")
 
-            await context.close()
-            await self.browser_pool.put((index, browser))
+            # On failure the context/page pair may be dead (crashed page or
+            # renderer), so re-pool the slot with a sentinel proxy marker
+            # that can never equal a request proxy: the next solve is forced
+            # down the recreate branch and gets a fresh context/page instead
+            # of failing on the same dead pair forever.
+            pool_proxy = proxy if solved else object()
+            await self.browser_pool.put((index, browser, context, page, pool_proxy, pooled_user_agent))
 
     async def process_turnstile(self):
         """Handle the /turnstile endpoint requests."""
@@ -307,34 +490,48 @@ class TurnstileAPIServer:
         proxy = request.args.get('proxy')
 
         if not url or not sitekey:
-            return jsonify({
-                "status": "error",
-                "error": "Both 'url' and 'sitekey' are required"
-            }), 400
+            return json_error(ERR_MISSING_PARAMS, 400)
+
+        if self.solve_semaphore.locked() and self.pending_solves >= self.max_pending_solves:
+            logger.warning("Request rejected: solve backlog full")
+            return json_error(ERR_SERVER_BUSY, 429)
 
-        task_id = str(uuid.uuid4())
+        task_id = secrets.token_hex(16)
         self.results[task_id] = "CAPTCHA_NOT_READY"
 
+        # Count the solve as pending before the task is created, not when it
+        # first runs: a request burst could otherwise schedule arbitrarily
+        # many solves before any counter moved and the 429 gate above would
+        # never trip. The task's finally does the matching decrement.
+        self.pending_solves += 1
         try:
-            asyncio.create_task(self._solve_turnstile(
+            asyncio.create_task(self._solve_turnstile_bounded(
                 task_id=task_id, url=url, sitekey=sitekey, action=action, cdata=cdata, proxy=proxy))
-
-            if self.debug:
-                logger.debug(f"Request completed with taskid {task_id}.")
-            return jsonify({"task_id": task_id}), 202
         except Exception as e:
+            # The task never ran, so its finally will not decrement.
+            self.pending_solves -= 1
             logger.error(f"Unexpected error processing request: {str(e)}")
             return jsonify({
                 "status": "error",
                 "error": str(e)
             }), 500
 
+        if self.debug:
+            logger.debug(f"Request completed with taskid {task_id}.")
+        body = (orjson.dumps({"task_id": task_id}) if orjson
+                else json.dumps({"task_id": task_id}).encode("utf-8"))
+        return Response(body, status=202, mimetype='application/json')
+
     async def get_result(self):
         """Return solved data"""
         task_id = request.args.get('id')
 
-        if not task_id or task_id not in self.results:
-            return jsonify({"status": "error", "error": "Invalid task ID/Request parameter"}), 400
+        if not task_id:
+            return json_error(ERR_MISSING_ID, 400)
+
+        if task_id not in self.results:
+            # Unknown id, or the entry expired out of the TTL cache.
+            return json_error(ERR_UNKNOWN_ID, 404)
 
         result = self.results[task_id]
         status_code = 200
@@ -344,25 +541,30 @@ class TurnstileAPIServer:
 
         return result, status_code
 
+    INDEX_BYTES = """
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Turnstile Solver API</title>
+            <script src="https://cdn.tailwindcss.com"></script>
+        </head>
+        <body class="bg-gray-900 text-gray-200 min-h-screen flex items-center justify-center">
+            <div class="text-center">
+            <h1 class="text-3xl font-bold mb-6 text-center text-red-500">KRALLAR ICIN</h1>
+            </div>
+        </body>
+        </html>
+    """.encode("utf-8")
+
     @staticmethod
     async def index():
-        """Serve the API documentation page."""
-        return """
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>Turnstile Solver API</title>
-                <script src="https://cdn.tailwindcss.com"></script>
-            </head>
-            <body class="bg-gray-900 text-gray-200 min-h-screen flex items-center justify-center">
-                <div class="text-center">
-                <h1 class="text-3xl font-bold mb-6 text-center text-red-500">KRALLAR ICIN</h1>
-                </div>
-            </body>
-            </html>
-        """
+        """Serve the API documentation page from pre-encoded bytes."""
+        return Response(
+            TurnstileAPIServer.INDEX_BYTES,
+            mimetype='text/html',
+            headers={'Cache-Control': 'public, max-age=3600'})
 
 
 def parse_args():
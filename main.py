@@ -1,44 +1,47 @@
 from api_solver import create_app
 import asyncio
 import logging
-import time
 import sys
 
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
 
 class CustomLogger(logging.Logger):
-    COLORS = {
-        'DEBUG': '\033[35m',    # Magenta
-        'INFO': '\033[34m',     # Blue
-        'SUCCESS': '\033[32m',  # Green
-        'WARNING': '\033[33m',  # Yellow
-        'ERROR': '\033[31m',    # Red
-    }
-    RESET = '\033[0m'  # Reset color
+    def success(self, message, *args, **kwargs):
+        if self.isEnabledFor(SUCCESS):
+            self._log(SUCCESS, message, args, **kwargs)
 
-    def format_message(self, level, message):
-        timestamp = time.strftime('%H:%M:%S')
-        return f"[{timestamp}] [{self.COLORS.get(level, '')}{level}{self.RESET}] -> {message}"
 
-    def debug(self, message, *args, **kwargs):
-        super().debug(self.format_message('DEBUG', message), *args, **kwargs)
+RESET = '\033[0m'  # Reset color
 
-    def info(self, message, *args, **kwargs):
-        super().info(self.format_message('INFO', message), *args, **kwargs)
+# Colorized level names precomputed once per process.
+LEVEL_PREFIX = {
+    'DEBUG': f"\033[35mDEBUG{RESET}",    # Magenta
+    'INFO': f"\033[34mINFO{RESET}",      # Blue
+    'SUCCESS': f"\033[32mSUCCESS{RESET}",  # Green
+    'WARNING': f"\033[33mWARNING{RESET}",  # Yellow
+    'ERROR': f"\033[31mERROR{RESET}",    # Red
+}
 
-    def success(self, message, *args, **kwargs):
-        super().info(self.format_message('SUCCESS', message), *args, **kwargs)
 
-    def warning(self, message, *args, **kwargs):
-        super().warning(self.format_message('WARNING', message), *args, **kwargs)
+class ColorLevelFilter(logging.Filter):
+    """Attach the precomputed colorized level name for the Formatter."""
 
-    def error(self, message, *args, **kwargs):
-        super().error(self.format_message('ERROR', message), *args, **kwargs)
+    def filter(self, record):
+        record.levelprefix = LEVEL_PREFIX.get(
+            record.levelname, record.levelname)
+        return True
 
 
 logging.setLoggerClass(CustomLogger)
 logger = logging.getLogger("TurnstileTester")
 logger.setLevel(logging.DEBUG)
 handler = logging.StreamHandler(sys.stdout)
+handler.setFormatter(logging.Formatter(
+    "[%(asctime)s] [%(levelprefix)s] -> %(message)s",
+    datefmt='%H:%M:%S'))
+handler.addFilter(ColorLevelFilter())
 logger.addHandler(handler)
 
 
@@ -60,4 +63,11 @@ async def main():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
+
     asyncio.run(main())
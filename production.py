@@ -30,62 +30,137 @@ class ProductionConfig:
         self.useragent = os.getenv('USER_AGENT')
 
         # Security settings
+        # Multiprocess serving is opt-in: results live per worker, so
+        # WORKERS > 1 requires sticky routing upstream for /result lookups
+        # (see run_multiprocess_server). Until a shared results store
+        # exists, the default stays a single worker.
         self.workers = int(os.getenv('WORKERS', 1))
         self.max_connections = int(os.getenv('MAX_CONNECTIONS', 100))
 
         # Log the API key on first run for manual setup
         if not os.getenv('TURNSTILE_API_KEY'):
+            # Export it so spawned worker processes authenticate against the
+            # same key instead of each generating their own.
+            os.environ['TURNSTILE_API_KEY'] = self.api_key
             print(f"🔑 Generated API Key: {self.api_key}")
             print(
                 "⚠️  Save this key! Set TURNSTILE_API_KEY environment variable for future runs.")
 
+    @property
+    def threads_per_worker(self):
+        """Each worker process owns its own share of the browser pool."""
+        return max(1, self.threads // self.workers)
 
-async def run_production_server():
-    """Run the production server with optimized settings."""
-    config = ProductionConfig()
 
-    # Setup logging
+config = ProductionConfig()
+
+# Each spawned worker re-imports this module with its own pid, so with
+# multiple workers every worker snapshots results to its own file instead
+# of racing the others over a shared results.json.
+if config.workers > 1:
+    os.environ['RESULTS_FILE'] = f"results-worker-{os.getpid()}.json"
+
+# Module-level app so Hypercorn's multiprocess runner can import
+# "production:app" in each worker; every worker launches only its share
+# of the browsers.
+app = create_app(
+    debug=config.debug,
+    headless=config.headless,
+    useragent=config.useragent,
+    browser_type=config.browser_type,
+    thread=config.threads_per_worker,
+    proxy_support=True,
+    api_key=config.api_key
+)
+
+
+def setup_logging():
+    """Configure logging and return the production logger."""
     logging.basicConfig(
         level=logging.INFO if not config.debug else logging.DEBUG,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    logger = logging.getLogger("TurnstileProduction")
+    return logging.getLogger("TurnstileProduction")
+
+
+def build_server_config():
+    """Build the Hypercorn config shared by both serving modes."""
+    from hypercorn import Config
+
+    server_config = Config()
+    server_config.bind = [f"{config.host}:{config.port}"]
+    server_config.workers = config.workers
+    server_config.max_incomplete_streams = config.max_connections
+
+    # Ask Hypercorn for uvloop workers so the optimization also applies in
+    # multiprocess mode, where spawned workers import this module and never
+    # hit the uvloop.install() in the __main__ block.
+    try:
+        import uvloop  # noqa: F401
+        server_config.worker_class = "uvloop"
+    except ImportError:
+        pass
+
+    # Note: Security headers can be added at reverse proxy level (nginx)
+
+    return server_config
+
 
+def log_startup(logger):
     logger.info(f"🚀 Starting Turnstile API in production mode")
     logger.info(
         f"🌐 Server will be available at http://{config.host}:{config.port}")
     logger.info(
         f"🔒 API Authentication: {'Enabled' if config.api_key else 'Disabled'}")
-    logger.info(f"🧠 Browser threads: {config.threads}")
+    logger.info(
+        f"🧠 Workers: {config.workers} x {config.threads_per_worker} browser threads")
     logger.info(f"👻 Headless mode: {config.headless}")
 
+
+async def run_production_server():
+    """Run the single-worker production server."""
+    logger = setup_logging()
+    log_startup(logger)
+
     try:
-        app = create_app(
-            debug=config.debug,
-            headless=config.headless,
-            useragent=config.useragent,
-            browser_type=config.browser_type,
-            thread=config.threads,
-            proxy_support=True,
-            api_key=config.api_key
-        )
-
-        # Use Hypercorn for production ASGI serving
         import hypercorn.asyncio
-        from hypercorn import Config
 
-        server_config = Config()
-        server_config.bind = [f"{config.host}:{config.port}"]
-        server_config.workers = config.workers
-        server_config.max_incomplete_streams = config.max_connections
+        await hypercorn.asyncio.serve(app, build_server_config())
+    except Exception as e:
+        logger.error(f"❌ Failed to start server: {e}")
+        sys.exit(1)
+
+
+def run_multiprocess_server():
+    """Spawn one worker process per configured worker.
 
-        # Note: Security headers can be added at reverse proxy level (nginx)
+    Results are kept per worker, so /result lookups must hit the worker
+    that solved the task (use sticky routing upstream, or WORKERS=1).
+    """
+    logger = setup_logging()
+    log_startup(logger)
 
-        await hypercorn.asyncio.serve(app, server_config)
+    try:
+        from hypercorn.run import run
 
+        server_config = build_server_config()
+        server_config.application_path = "production:app"
+        run(server_config)
     except Exception as e:
         logger.error(f"❌ Failed to start server: {e}")
         sys.exit(1)
 
+
 if __name__ == "__main__":
-    asyncio.run(run_production_server())
+    # uvloop noticeably cuts event-loop overhead for this CDP/HTTP-bound
+    # workload; fall back to the stock loop where it is unavailable.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    if config.workers > 1:
+        run_multiprocess_server()
+    else:
+        asyncio.run(run_production_server())
@@ -1,7 +1,10 @@
 import sys
 import time
 import logging
+from contextlib import ExitStack
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import urlsplit
 from dataclasses import dataclass
 # from camoufox.sync_api import Camoufox
 from patchright.sync_api import sync_playwright
@@ -26,33 +29,65 @@ COLORS = {
 }
 
 
-class CustomLogger(logging.Logger):
-    @staticmethod
-    def format_message(level, color, message):
-        timestamp = time.strftime('%H:%M:%S')
-        return f"[{timestamp}] [{COLORS.get(color)}{level}{COLORS.get('RESET')}] -> {message}"
+# Chromium flags that trim renderer/browser startup work the widget never
+# needs, computed once for every solver instance.
+FAST_CHROMIUM_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-extensions",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+    "--metrics-recording-only",
+)
+
+# Dedicated level so logger.success goes through normal level filtering.
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+# Colorized level names precomputed once; emitting a record costs a single
+# dict lookup, and the timestamp comes from the Formatter's asctime, which
+# logging caches between records in the same second.
+LEVEL_PREFIX = {
+    'DEBUG': f"{COLORS['MAGENTA']}DEBUG{COLORS['RESET']}",
+    'INFO': f"{COLORS['BLUE']}INFO{COLORS['RESET']}",
+    'SUCCESS': f"{COLORS['GREEN']}SUCCESS{COLORS['RESET']}",
+    'WARNING': f"{COLORS['YELLOW']}WARNING{COLORS['RESET']}",
+    'ERROR': f"{COLORS['RED']}ERROR{COLORS['RESET']}",
+}
 
-    def debug(self, message, *args, **kwargs):
-        super().debug(self.format_message('DEBUG', 'MAGENTA', message), *args, **kwargs)
 
-    def info(self, message, *args, **kwargs):
-        super().info(self.format_message('INFO', 'BLUE', message), *args, **kwargs)
+class ColorLevelFilter(logging.Filter):
+    """Attach the precomputed colorized level name for the Formatter."""
 
-    def success(self, message, *args, **kwargs):
-        super().info(self.format_message('SUCCESS', 'GREEN', message), *args, **kwargs)
+    def filter(self, record):
+        record.levelprefix = LEVEL_PREFIX.get(
+            record.levelname, record.levelname)
+        return True
 
-    def warning(self, message, *args, **kwargs):
-        super().warning(self.format_message('WARNING', 'YELLOW', message), *args, **kwargs)
 
-    def error(self, message, *args, **kwargs):
-        super().error(self.format_message('ERROR', 'RED', message), *args, **kwargs)
+class CustomLogger(logging.Logger):
+    def success(self, message, *args, **kwargs):
+        if self.isEnabledFor(SUCCESS):
+            self._log(SUCCESS, message, args, **kwargs)
 
 
 logging.setLoggerClass(CustomLogger)
 logger = logging.getLogger("TurnstileAPIServer")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-logger.addHandler(handler)
+# Guard against re-imports: attaching a second handler would double every
+# emitted record, and propagation to the root logger would do the same.
+if not logger.handlers:
+    logger.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(
+        "[%(asctime)s] [%(levelprefix)s] -> %(message)s",
+        datefmt='%H:%M:%S'))
+    handler.addFilter(ColorLevelFilter())
+    logger.addHandler(handler)
+logger.propagate = False
 
 
 class TurnstileSolver:
@@ -86,12 +121,33 @@ class TurnstileSolver:
     </html>
     """
 
+    # Template halves split once at class load; the per-solve body is a
+    # single f-string instead of a full-template replace scan.
+    HTML_PRE, HTML_POST = HTML_TEMPLATE.split("<!-- cf turnstile -->", 1)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _build_body(sitekey: str, action: str = None, cdata: str = None) -> bytes:
+        """Build (and memoize) the pre-encoded widget host page.
+
+        Only the data-* attributes vary between solves, so the common
+        repeat-solve case (same sitekey across many URLs) reuses the
+        encoded bytes with no string work or re-encoding at all.
+        """
+        action_attr = f' data-action="{action}"' if action else ''
+        cdata_attr = f' data-cdata="{cdata}"' if cdata else ''
+        return (
+            f'{TurnstileSolver.HTML_PRE}'
+            f'<div class="cf-turnstile" data-sitekey="{sitekey}"'
+            f'{action_attr}{cdata_attr}></div>{TurnstileSolver.HTML_POST}'
+        ).encode("utf-8")
+
     def __init__(self, debug: bool = False, headless: Optional[bool] = False, useragent: Optional[str] = None, browser_type: str = "chromium"):
         self.debug = debug
         self.browser_type = browser_type
         self.headless = headless
         self.useragent = useragent
-        self.browser_args = []
+        self.browser_args = list(FAST_CHROMIUM_ARGS)
         if useragent:
             self.browser_args.append(f"--user-agent={useragent}")
 
@@ -102,60 +158,64 @@ class TurnstileSolver:
         else:
             page = browser.new_page()
 
-        url_with_slash = url + "/" if not url.endswith("/") else url
+        url_with_slash = url if url.endswith("/") else url + "/"
 
         if self.debug:
             logger.debug(f"Navigating to URL: {url_with_slash}")
 
-        turnstile_div = f'<div class="cf-turnstile" data-sitekey="{sitekey}"' + (
-            f' data-action="{action}"' if action else '') + (f' data-cdata="{cdata}"' if cdata else '') + '></div>'
-        page_data = self.HTML_TEMPLATE.replace(
-            "<!-- cf turnstile -->", turnstile_div)
+        page_data = self._build_body(sitekey, action, cdata)
 
         page.route(url_with_slash, lambda route: route.fulfill(
-            body=page_data, status=200))
+            body=page_data, status=200, content_type="text/html"))
         page.goto(url_with_slash)
 
-        return page
+        # Locators parse their selector once and are reused every attempt,
+        # unlike the string-selector page.input_value/page.click calls.
+        token_locator = page.locator("[name=cf-turnstile-response]")
+        click_locator = page.locator("div.cf-turnstile")
 
-    def _get_turnstile_response(self, page, context, max_attempts: int = 10) -> Optional[str]:
+        return page, token_locator, click_locator
+
+    def _get_turnstile_response(self, page, token_locator, click_locator, context, max_attempts: int = 10) -> Optional[str]:
         """Attempt to retrieve Turnstile response."""
+        # Exponential backoff: fast challenges are re-checked within 100ms
+        # instead of a flat half-second, slow ones back off up to 1s.
+        delay = 0.1
         for _ in range(max_attempts):
-            # time.sleep(100)
-            logger.debug(f"Attempt {_ + 1}: No Turnstile response yet.")
-
             try:
-                turnstile_check = page.input_value(
-                    "[name=cf-turnstile-response]")
-                print('turnstile_check', turnstile_check)
-
-                # Get cookies from the page context, not just context
-                cookies = page.context.cookies()
-                print('cookies', cookies)
-
-                # Also try to get cookies from the page directly
-                page_cookies = page.evaluate("() => document.cookie")
-                print('page_cookies', page_cookies)
-
-                if turnstile_check == "":
-                    page.click("//div[@class='cf-turnstile']", timeout=3000)
-                    time.sleep(0.5)
-                else:
-                    turnstile_element = page.input_value(
-                        "[name=cf-turnstile-response]")  # its value
-
-                    # Try to find cf_clearance cookie
-                    cf_cookie = next(
-                        (c for c in cookies if c["name"] == "cf_clearance"), None)
+                token = token_locator.input_value()
+
+                if not token:
+                    if self.debug:
+                        logger.debug(
+                            f"Attempt {_ + 1}: No Turnstile response yet.")
+                    click_locator.click(timeout=3000)
+                    time.sleep(delay)
+                    delay = min(delay * 2, 1.0)
+                    continue
+
+                if self.debug:
+                    # Cookie dumps are diagnostics only - only pay the extra
+                    # CDP round-trips when debug is on.
+                    cookies = page.context.cookies()
+                    page_cookies = page.evaluate("() => document.cookie")
+                    print('page_cookies', page_cookies)
+
+                    # Single pass over the cookie list: collect cf_-prefixed
+                    # cookies and pick out cf_clearance as we go instead of
+                    # a generator scan plus a second comprehension.
+                    cf_cookie = None
+                    cf_cookies = []
+                    for c in cookies:
+                        name = c["name"]
+                        if name.startswith("cf_"):
+                            cf_cookies.append(c)
+                            if name == "cf_clearance":
+                                cf_cookie = c
                     print("cf_clearance:",
                           cf_cookie["value"] if cf_cookie else "Not found")
-
-                    # Also check for other common Cloudflare cookies
-                    cf_cookies = [
-                        c for c in cookies if c["name"].startswith("cf_")]
                     print("All cf_ cookies:", cf_cookies)
 
-                    # Check if any cookies exist at all
                     if not cookies:
                         print("No cookies found in context")
                     else:
@@ -164,12 +224,10 @@ class TurnstileSolver:
                             print(
                                 f"Cookie: {cookie['name']} = {cookie['value'][:50]}...")
 
-                    if turnstile_element:
-                        return turnstile_element
-                    break
+                return token
             except Exception as e:
-                print(f"Error in attempt {_ + 1}: {e}")
-                pass
+                if self.debug:
+                    print(f"Error in attempt {_ + 1}: {e}")
 
         return None
 
@@ -191,14 +249,15 @@ class TurnstileSolver:
 
     def _check_page_info(self, page):
         """Check current page URL and domain for debugging."""
+        if not self.debug:
+            return None
+
         try:
             current_url = page.url
             print(f"Current page URL: {current_url}")
 
-            # Get domain from URL
-            from urllib.parse import urlparse
-            parsed_url = urlparse(current_url)
-            domain = parsed_url.netloc
+            # urlsplit skips urlparse's params handling; plenty for netloc
+            domain = urlsplit(current_url).netloc
             print(f"Current domain: {domain}")
 
             # Check if we're on the expected domain
@@ -212,19 +271,24 @@ class TurnstileSolver:
         Solve the Turnstile challenge and return the result.
         """
         start_time = time.time()
-        if self.browser_type in ["chromium", "chrome", "msedge"]:
-            playwright = sync_playwright().start()
-            browser = playwright.chromium.launch(
-                headless=self.headless,
-                args=self.browser_args,
-            )
-            context = browser.new_context()
+        # A single stack owns the whole teardown: browser.close, then the
+        # Playwright driver, each exactly once, in LIFO order. The old
+        # finally block closed only the browser and leaked the driver.
+        with ExitStack() as stack:
+            if self.browser_type in ["chromium", "chrome", "msedge"]:
+                playwright = stack.enter_context(sync_playwright())
+                browser = playwright.chromium.launch(
+                    headless=self.headless,
+                    args=self.browser_args,
+                )
+                stack.callback(browser.close)
+                context = browser.new_context()
 
-        # elif self.browser_type == "camoufox":
-        #     browser = Camoufox(headless=self.headless).start()
+            # elif self.browser_type == "camoufox":
+            #     browser = Camoufox(headless=self.headless).start()
 
-        try:
-            page = self._setup_page(browser, url, sitekey, action, cdata)
+            page, token_locator, click_locator = self._setup_page(
+                browser, url, sitekey, action, cdata)
 
             # Check page info for debugging
             self._check_page_info(page)
@@ -237,7 +301,8 @@ class TurnstileSolver:
             if cookies:
                 print(f"Initial cookies found: {len(cookies)}")
 
-            turnstile_value = self._get_turnstile_response(page, context)
+            turnstile_value = self._get_turnstile_response(
+                page, token_locator, click_locator, context)
 
             elapsed_time = round(time.time() - start_time, 3)
 
@@ -253,8 +318,11 @@ class TurnstileSolver:
             else:
                 # Get final cookies after solving
                 final_cookies = page.context.cookies()
-                cf_clearance = next(
-                    (c for c in final_cookies if c["name"] == "cf_clearance"), None)
+                cf_clearance = None
+                for c in final_cookies:
+                    if c["name"] == "cf_clearance":
+                        cf_clearance = c
+                        break
 
                 result = TurnstileResult(
                     turnstile_value=turnstile_value,
@@ -265,13 +333,10 @@ class TurnstileSolver:
                 logger.success(
                     f"Successfully solved captcha: {turnstile_value[:45]}... in {elapsed_time} seconds")
 
-        finally:
-            browser.close()
-
-            if self.debug:
-                logger.debug(
-                    f"Elapsed time: {result.elapsed_time_seconds} seconds")
-                logger.debug("Browser closed. Returning result.")
+        if self.debug:
+            logger.debug(
+                f"Elapsed time: {result.elapsed_time_seconds} seconds")
+            logger.debug("Browser closed. Returning result.")
 
         return result
 